@@ -8,11 +8,16 @@ Crypto prediction accuracy tracker (simple, educational).
 """
 
 import sqlite3
-import requests
-import time
+import asyncio
+import aiohttp
 import logging
-from bs4 import BeautifulSoup
-from datetime import datetime, date
+import orjson
+import re
+from aiolimiter import AsyncLimiter
+from tenacity import (AsyncRetrying, retry_if_exception_type, retry_if_result,
+                      stop_after_attempt, wait_exponential)
+from lxml import etree, html as lxml_html
+from datetime import datetime, date, timezone
 from dateutil import parser
 import os
 import pandas as pd
@@ -23,6 +28,24 @@ DB_PATH = os.environ.get("TRACKER_DB", "predictions.db")
 USER_AGENT = "crypto-accuracy-tracker/1.0 (+https://example.local/)"
 COINGECKO_BASE = "https://api.coingecko.com/api/v3"
 COINCodex_BASE = "https://coincodex.com"   # site root (API docs: coincodex.com/page/api/)
+# Request budgets (requests per minute); CoinGecko's free tier allows roughly 10-50/min
+COINGECKO_RPM = int(os.environ.get("COINGECKO_RPM", 30))
+COINCODEX_RPM = int(os.environ.get("COINCODEX_RPM", 30))
+# Max in-flight requests per host
+MAX_CONCURRENCY = int(os.environ.get("MAX_CONCURRENCY", 5))
+# Keep-alive connection pool shared by all requests in a run
+POOL_SIZE = 10
+KEEPALIVE_TIMEOUT = 60  # seconds an idle connection stays open for reuse
+# Transient statuses worth retrying (with exponential backoff / Retry-After)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+MAX_ATTEMPTS = 5
+# Patterns for the CoinCodex scrape fallback
+DATE_RE = re.compile(r"(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})")
+PRICE_RE = re.compile(r"\$?\s?([0-9]{1,3}(?:,[0-9]{3})*(?:\.\d+)?)")
+# First <h2> whose text contains "price prediction" (case-insensitive), evaluated entirely in libxml2
+H2_PRED_XPATH = etree.XPath(
+    "(//h2[contains(translate(string(.), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'),"
+    " 'price prediction')])[1]")
 # Which symbols to track (CoinGecko IDs and a human symbol)
 TRACK = [
     {"gecko_id": "bitcoin", "symbol": "BTC"},
@@ -32,21 +55,54 @@ TRACK = [
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s: %(message)s")
 
+# ---------- Rate limiting ----------
+# Semaphores bound in-flight requests; token-bucket limiters keep us under each site's RPM.
+coingecko_sem = asyncio.Semaphore(MAX_CONCURRENCY)
+coingecko_limiter = AsyncLimiter(COINGECKO_RPM, 60)
+coincodex_sem = asyncio.Semaphore(MAX_CONCURRENCY)
+coincodex_limiter = AsyncLimiter(COINCODEX_RPM, 60)
+
 
 # ---------- DB ----------
 def init_db(conn):
     c = conn.cursor()
+    # WAL lets readers run alongside the writer and avoids a rollback-journal page copy per write;
+    # synchronous=NORMAL is safe under WAL and drops the fsync on every commit.
+    c.execute("PRAGMA journal_mode=WAL")
+    c.execute("PRAGMA synchronous=NORMAL")
+    c.execute("PRAGMA temp_store=MEMORY")
+    c.execute("PRAGMA mmap_size=268435456")  # 256 MiB
+    c.execute("PRAGMA cache_size=-20000")    # ~20 MB page cache
+    c.execute("""
+    CREATE TABLE IF NOT EXISTS coins (
+        id INTEGER PRIMARY KEY,
+        symbol TEXT NOT NULL UNIQUE,
+        gecko_id TEXT UNIQUE
+    )
+    """)
+    # keep coins in sync with TRACK: a symbol may get a new gecko_id, or a gecko_id a new symbol.
+    # In the latter case the old symbol gives up its gecko_id (keeping its history) so the
+    # UNIQUE constraint holds.
+    for coin in TRACK:
+        c.execute("UPDATE coins SET gecko_id = NULL WHERE gecko_id = ? AND symbol <> ?",
+                  (coin["gecko_id"], coin["symbol"]))
+        c.execute("""
+        INSERT INTO coins (symbol, gecko_id) VALUES (?, ?)
+        ON CONFLICT(symbol) DO UPDATE SET gecko_id = excluded.gecko_id
+        """, (coin["symbol"], coin["gecko_id"]))
     c.execute("""
     CREATE TABLE IF NOT EXISTS predictions (
         id INTEGER PRIMARY KEY,
-        symbol TEXT NOT NULL,
+        coin_id INTEGER NOT NULL,
         source TEXT NOT NULL,
         prediction_date TEXT NOT NULL,
         target_date TEXT NOT NULL,
         predicted_price REAL NOT NULL,
-        created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY(coin_id) REFERENCES coins(id)
     )
     """)
+    _migrate_predictions_symbol(c)
     c.execute("""
     CREATE TABLE IF NOT EXISTS results (
         id INTEGER PRIMARY KEY,
@@ -58,28 +114,158 @@ def init_db(conn):
         FOREIGN KEY(prediction_id) REFERENCES predictions(id)
     )
     """)
+    # historical daily prices never change once the day is over, so keep them locally
+    c.execute("""
+    CREATE TABLE IF NOT EXISTS price_cache (
+        gecko_id TEXT NOT NULL,
+        target_date TEXT NOT NULL,
+        usd REAL NOT NULL,
+        PRIMARY KEY(gecko_id, target_date)
+    )
+    """)
+    # support the anti-join + date filter in find_due_predictions
+    c.execute("CREATE INDEX IF NOT EXISTS idx_results_pid ON results(prediction_id)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_predictions_target ON predictions(target_date)")
     conn.commit()
 
 
+def _migrate_predictions_symbol(c):
+    """
+    Databases created before the coins table stored a free-text `symbol` on each prediction.
+    Rebuild predictions with a coin_id FK instead (SQLite can't change a column in place).
+    """
+    cols = [row[1] for row in c.execute("PRAGMA table_info(predictions)")]
+    if "symbol" not in cols:
+        return
+    logging.info("Migrating predictions.symbol -> predictions.coin_id")
+    # symbols no longer in TRACK keep their history, just without a CoinGecko mapping
+    c.execute("INSERT OR IGNORE INTO coins (symbol) SELECT DISTINCT symbol FROM predictions")
+    c.execute("""
+    CREATE TABLE predictions_new (
+        id INTEGER PRIMARY KEY,
+        coin_id INTEGER NOT NULL,
+        source TEXT NOT NULL,
+        prediction_date TEXT NOT NULL,
+        target_date TEXT NOT NULL,
+        predicted_price REAL NOT NULL,
+        created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY(coin_id) REFERENCES coins(id)
+    )
+    """)
+    c.execute("""
+    INSERT INTO predictions_new (id, coin_id, source, prediction_date, target_date, predicted_price, created_at)
+    SELECT p.id, co.id, p.source, p.prediction_date, p.target_date, p.predicted_price, p.created_at
+    FROM predictions p JOIN coins co ON co.symbol = p.symbol
+    """)
+    c.execute("DROP TABLE predictions")
+    c.execute("ALTER TABLE predictions_new RENAME TO predictions")
+
+
+def get_coin_ids(conn):
+    """
+    Returns {symbol: coins.id} for every known coin.
+    """
+    return dict(conn.execute("SELECT symbol, id FROM coins"))
+
+
+# ---------- Date parsing ----------
+# d-m-y / m-d-y style dates as found on CoinCodex (same separator both times)
+NUMERIC_DATE_RE = re.compile(r"(\d{1,2})([-/])(\d{1,2})\2(\d{2}|\d{4})")
+PREDICTION_HORIZON_DAYS = 5 * 366  # predictions further out than ~5 years are implausible
+
+
+def _fast_parse_date(s, today=None):
+    """
+    Parse a date string with datetime.strptime, falling back to the (much slower)
+    general-purpose dateutil parser only for formats we don't recognise.
+
+    Numeric dates are ambiguous between dd-mm-yyyy (CoinCodex's usual format) and mm-dd-yyyy.
+    When both readings are valid, keep the one that lands in the plausible prediction horizon
+    (today .. today + ~5y), preferring day-first if that doesn't settle it.
+    """
+    try:
+        return datetime.strptime(s, "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        pass
+    m = NUMERIC_DATE_RE.fullmatch(s) if isinstance(s, str) else None
+    if m:
+        sep = m.group(2)
+        year_fmt = "%Y" if len(m.group(4)) == 4 else "%y"
+        candidates = []
+        for fmt in (f"%d{sep}%m{sep}{year_fmt}", f"%m{sep}%d{sep}{year_fmt}"):
+            try:
+                candidates.append(datetime.strptime(s, fmt).date())
+            except ValueError:
+                continue
+        if len(candidates) == 2 and candidates[0] != candidates[1]:
+            today = today or date.today()
+            plausible = [d for d in candidates if 0 <= (d - today).days <= PREDICTION_HORIZON_DAYS]
+            return plausible[0] if len(plausible) == 1 else candidates[0]
+        if candidates:
+            return candidates[0]
+    return parser.parse(s, dayfirst=False).date()
+
+
 # ---------- CoinCodex: try API then fallback to scrape ----------
-def fetch_predictions_from_coincodex(symbol):
+def _parse_prediction_page(html):
+    """
+    Extract predictions from a CoinCodex coin page (raw HTML bytes).
+    Returns the same list-of-dicts shape as fetch_predictions_from_coincodex.
+    """
+    results = []
+    # raw bytes let lxml detect the encoding itself
+    doc = lxml_html.fromstring(html)
+    # This is heuristic: look for sections titled 'Price Prediction' or similar.
+    # You will need to adapt selectors if the site structure changes.
+    candidates = H2_PRED_XPATH(doc)
+    if candidates:
+        # find following siblings and parse numbers/dates
+        block = candidates[0].getnext()
+        # skip comments / processing instructions, like BeautifulSoup's find_next_sibling did
+        while block is not None and not isinstance(block.tag, str):
+            block = block.getnext()
+        if block is not None:
+            # naive number/date extraction (educational)
+            text = " | ".join(t.strip() for t in block.itertext() if t.strip())
+            # look for date-like and $-like numbers in the text
+            date_matches = DATE_RE.findall(text)
+            price_matches = PRICE_RE.findall(text)
+            if date_matches and price_matches:
+                # pair them in order (best-effort)
+                for i in range(min(len(date_matches), len(price_matches))):
+                    dt = date_matches[i]
+                    pr = price_matches[i].replace(',', '')
+                    try:
+                        parsed = _fast_parse_date(dt)
+                        results.append({
+                            "target_date": parsed.isoformat(),
+                            "predicted_price": float(pr),
+                            "source": "CoinCodex-scrape"
+                        })
+                    except Exception:
+                        continue
+    return results
+
+
+async def fetch_predictions_from_coincodex(session, symbol):
     """
-    Attempt to fetch predictions for `symbol` from CoinCodex.
+    Attempt to fetch predictions for `symbol` from CoinCodex using the shared aiohttp `session`.
     This function is intentionally simple and defensive:
     1) Try an undocumented API path (commonly used by community) - if it works.
     2) Fallback: scrape the coin page and attempt to parse visible 'price prediction' area.
 
     Returns a list of dicts: [{"target_date": "YYYY-MM-DD", "predicted_price": 12345.67, "source":"CoinCodex"}, ...]
     """
-    headers = {"User-Agent": USER_AGENT}
     results = []
 
     # Strategy 1: try basic API-ish endpoint (may or may not be available)
     try:
         api_url = f"{COINCodex_BASE}/api/coincodex/get_coin/{symbol.lower()}"
-        r = requests.get(api_url, headers=headers, timeout=15)
-        if r.status_code == 200:
-            j = r.json()
+        async with coincodex_sem, coincodex_limiter:
+            async with session.get(api_url) as r:
+                status = r.status
+                j = orjson.loads(await r.read()) if status == 200 else None
+        if status == 200:
             # best-effort extraction; real structure may differ - adapt as needed
             if isinstance(j, dict) and "price_prediction" in j:
                 preds = j.get("price_prediction") or []
@@ -88,18 +274,14 @@ def fetch_predictions_from_coincodex(symbol):
                     dt = p.get("date") or p.get("target_date") or None
                     price = p.get("price") or p.get("predicted_price") or None
                     if dt and price:
-                        try:
-                            parsed = parser.parse(dt).date()
-                        except Exception:
-                            # try dd-mm-yyyy formats, etc.
-                            parsed = parser.parse(dt, dayfirst=False).date()
+                        parsed = _fast_parse_date(dt)
                         results.append({
                             "target_date": parsed.isoformat(),
                             "predicted_price": float(price),
                             "source": "CoinCodex"
                         })
         else:
-            logging.debug("CoinCodex API attempt returned status %s", r.status_code)
+            logging.debug("CoinCodex API attempt returned status %s", status)
     except Exception as e:
         logging.debug("CoinCodex API attempt failed: %s", e)
 
@@ -107,38 +289,16 @@ def fetch_predictions_from_coincodex(symbol):
     if not results:
         try:
             page_url = f"{COINCodex_BASE}/currency/{symbol.lower()}"  # e.g. /currency/bitcoin
-            r = requests.get(page_url, headers=headers, timeout=15)
-            if r.status_code == 200:
-                soup = BeautifulSoup(r.text, "html.parser")
-                # This is heuristic: look for sections titled 'Price Prediction' or similar.
-                # You will need to adapt selectors if the site structure changes.
-                candidate = soup.find(lambda tag: tag.name == "h2" and "price prediction" in tag.text.lower())
-                if candidate:
-                    # find following siblings and parse numbers/dates
-                    block = candidate.find_next_sibling()
-                    if block:
-                        # naive number/date extraction (educational)
-                        text = block.get_text(" | ", strip=True)
-                        # look for date-like and $-like numbers in the text
-                        import re
-                        date_matches = re.findall(r"(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})", text)
-                        price_matches = re.findall(r"\$?\s?([0-9]{1,3}(?:[,][0-9]{3})*(?:\.\d+)?)", text)
-                        if date_matches and price_matches:
-                            # pair them in order (best-effort)
-                            for i in range(min(len(date_matches), len(price_matches))):
-                                dt = date_matches[i]
-                                pr = price_matches[i].replace(',', '')
-                                try:
-                                    parsed = parser.parse(dt, dayfirst=False).date()
-                                    results.append({
-                                        "target_date": parsed.isoformat(),
-                                        "predicted_price": float(pr),
-                                        "source": "CoinCodex-scrape"
-                                    })
-                                except Exception:
-                                    continue
+            async with coincodex_sem, coincodex_limiter:
+                async with session.get(page_url) as r:
+                    status = r.status
+                    html = await r.read() if status == 200 else None
+            if status == 200:
+                # parsing is blocking CPU work; run it in the default thread pool so
+                # other coins' requests keep flowing on the event loop meanwhile
+                results = await asyncio.to_thread(_parse_prediction_page, html)
             else:
-                logging.debug("CoinCodex page returned status %s", r.status_code)
+                logging.debug("CoinCodex page returned status %s", status)
         except Exception as e:
             logging.debug("CoinCodex scrape failed: %s", e)
 
@@ -146,61 +306,158 @@ def fetch_predictions_from_coincodex(symbol):
 
 
 # ---------- CoinGecko: get actual price on target date ----------
-def get_actual_price_from_coingecko(gecko_id, target_date):
+_backoff = wait_exponential(multiplier=0.5, max=60)
+
+
+def _retry_after_or_backoff(retry_state):
+    """
+    Wait strategy: honour CoinGecko's Retry-After header on a 429, otherwise back off exponentially
+    (0.5s, 1s, 2s, ... capped at 60s).
+    """
+    outcome = retry_state.outcome
+    if outcome is not None and not outcome.failed:
+        status, headers, _ = outcome.result()
+        if status == 429:
+            try:
+                return float(headers.get("Retry-After", "60"))
+            except ValueError:
+                pass
+    return _backoff(retry_state)
+
+
+async def _coingecko_get(session, url):
+    """
+    GET `url` from CoinGecko under the rate limiter, retrying transient failures.
+    Returns (status, headers, body_bytes) of the last attempt.
+    """
+    async for attempt in AsyncRetrying(
+            stop=stop_after_attempt(MAX_ATTEMPTS),
+            wait=_retry_after_or_backoff,
+            retry=(retry_if_exception_type((aiohttp.ClientError, asyncio.TimeoutError))
+                   | retry_if_result(lambda res: res[0] in RETRY_STATUSES)),
+            retry_error_callback=lambda retry_state: retry_state.outcome.result()):
+        with attempt:
+            async with coingecko_sem, coingecko_limiter:
+                async with session.get(url) as r:
+                    result = (r.status, r.headers, await r.read())
+        if not attempt.retry_state.outcome.failed:
+            attempt.retry_state.set_result(result)
+    return result
+
+
+async def get_actual_price_from_coingecko(session, gecko_id, target_date):
     """
     Returns the USD price for the coin on target_date (YYYY-MM-DD) using CoinGecko history endpoint.
     CoinGecko expects date in DD-MM-YYYY for the /history endpoint.
     """
-    headers = {"User-Agent": USER_AGENT}
     dt = datetime.fromisoformat(target_date).date()
     date_for_api = dt.strftime("%d-%m-%Y")
     url = f"{COINGECKO_BASE}/coins/{gecko_id}/history?date={date_for_api}"
-    r = requests.get(url, headers=headers, timeout=15)
-    if r.status_code == 200:
-        j = r.json()
+    try:
+        status, _, body = await _coingecko_get(session, url)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logging.warning("CoinGecko history fetch failed for %s on %s: %s", gecko_id, target_date, e)
+        return None
+    if status == 200:
+        j = orjson.loads(body)
         md = j.get("market_data")
         if md and "current_price" in md and "usd" in md["current_price"]:
             return float(md["current_price"]["usd"])
     logging.warning("CoinGecko history fetch failed for %s on %s (status %s). Response: %s",
-                    gecko_id, target_date, r.status_code, r.text[:200])
+                    gecko_id, target_date, status, body[:200].decode(errors="replace"))
     return None
 
 
+async def get_price_range_from_coingecko(session, gecko_id, start_date, end_date):
+    """
+    Returns {"YYYY-MM-DD": usd} for every UTC day between start_date and end_date (inclusive)
+    using a single CoinGecko /market_chart/range call.
+    Each day takes the first price point of that day, i.e. the one closest to 00:00 UTC,
+    which is what the /history endpoint reports.
+    """
+    ts_from = int(datetime.fromisoformat(start_date).replace(tzinfo=timezone.utc).timestamp())
+    ts_to = int(datetime.fromisoformat(end_date).replace(tzinfo=timezone.utc).timestamp()) + 86400
+    url = f"{COINGECKO_BASE}/coins/{gecko_id}/market_chart/range?vs_currency=usd&from={ts_from}&to={ts_to}"
+    try:
+        status, _, body = await _coingecko_get(session, url)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logging.warning("CoinGecko range fetch failed for %s %s..%s: %s", gecko_id, start_date, end_date, e)
+        return {}
+    if status != 200:
+        logging.warning("CoinGecko range fetch failed for %s %s..%s (status %s). Response: %s",
+                        gecko_id, start_date, end_date, status, body[:200].decode(errors="replace"))
+        return {}
+    prices = {}
+    for ts_ms, usd in orjson.loads(body).get("prices") or []:
+        day = datetime.fromtimestamp(ts_ms / 1000, tz=timezone.utc).date().isoformat()
+        # points come back in chronological order; keep the earliest of each day
+        prices.setdefault(day, float(usd))
+    return prices
+
+
 # ---------- DB helpers ----------
-def insert_prediction(conn, symbol, source, prediction_date, target_date, predicted_price):
-    c = conn.cursor()
-    c.execute("""
-    INSERT INTO predictions (symbol, source, prediction_date, target_date, predicted_price)
+def insert_prediction(conn, coin_id, source, prediction_date, target_date, predicted_price):
+    """
+    Insert one prediction and return its id; caller commits so a whole run is one transaction.
+    RETURNING (SQLite 3.35+) hands back the id from the same statement.
+    """
+    return conn.execute("""
+    INSERT INTO predictions (coin_id, source, prediction_date, target_date, predicted_price)
     VALUES (?, ?, ?, ?, ?)
-    """, (symbol, source, prediction_date, target_date, predicted_price))
-    conn.commit()
-    return c.lastrowid
+    RETURNING id
+    """, (coin_id, source, prediction_date, target_date, predicted_price)).fetchone()[0]
 
 
 def find_due_predictions(conn, as_of_date=None):
     """
     Find predictions with target_date <= as_of_date that don't have results yet.
+    Rows are (id, symbol, source, target_date, predicted_price, gecko_id).
+    Dates are stored as ISO YYYY-MM-DD strings, so a plain string comparison is correct
+    and lets SQLite use idx_predictions_target.
     """
     if as_of_date is None:
         as_of_date = date.today().isoformat()
     c = conn.cursor()
     c.execute("""
-    SELECT p.id, p.symbol, p.source, p.target_date, p.predicted_price
+    SELECT p.id, co.symbol, p.source, p.target_date, p.predicted_price, co.gecko_id
     FROM predictions p
+    JOIN coins co ON co.id = p.coin_id
     LEFT JOIN results r ON r.prediction_id = p.id
-    WHERE r.id IS NULL AND DATE(p.target_date) <= DATE(?)
+    WHERE r.id IS NULL AND p.target_date <= ?
     """, (as_of_date,))
     return c.fetchall()
 
 
-def insert_result(conn, prediction_id, actual_price, abs_error, pct_error):
-    c = conn.cursor()
-    c.execute("""
+def insert_results(conn, rows):
+    """
+    Bulk-insert (prediction_id, actual_price, abs_error, pct_error) tuples; caller commits.
+    """
+    conn.executemany("""
     INSERT INTO results (prediction_id, actual_price, abs_error, pct_error)
     VALUES (?, ?, ?, ?)
-    """, (prediction_id, actual_price, abs_error, pct_error))
-    conn.commit()
-    return c.lastrowid
+    """, rows)
+
+
+def get_cached_prices(conn, gecko_id, start_date, end_date):
+    """
+    Returns {"YYYY-MM-DD": usd} of cached prices for gecko_id between start_date and end_date (inclusive).
+    """
+    c = conn.cursor()
+    c.execute("""
+    SELECT target_date, usd FROM price_cache
+    WHERE gecko_id = ? AND target_date BETWEEN ? AND ?
+    """, (gecko_id, start_date, end_date))
+    return dict(c.fetchall())
+
+
+def cache_prices(conn, rows):
+    """
+    Store (gecko_id, target_date, usd) tuples in the price cache; caller commits.
+    """
+    conn.executemany("""
+    INSERT OR IGNORE INTO price_cache (gecko_id, target_date, usd)
+    VALUES (?, ?, ?)
+    """, rows)
 
 # ... your code that creates df with crypto data ...
 
@@ -216,58 +473,91 @@ else:
     df.to_csv(filename, index=False)
 
 # ---------- MAIN RUN ----------
-def main():
+async def main():
     conn = sqlite3.connect(DB_PATH)
     init_db(conn)
 
     today_iso = date.today().isoformat()
     logging.info("Tracker run for %s", today_iso)
 
-    # 1) Fetch predictions (for each tracked coin)
-    for coin in TRACK:
-        symbol = coin["symbol"]
-        gecko_id = coin["gecko_id"]
+    # One shared session per run so every request reuses the same keep-alive connection pool
+    # (one TCP+TLS handshake per host instead of one per request)
+    connector = aiohttp.TCPConnector(limit=POOL_SIZE, limit_per_host=MAX_CONCURRENCY,
+                                     keepalive_timeout=KEEPALIVE_TIMEOUT, ttl_dns_cache=300)
+    async with aiohttp.ClientSession(connector=connector, headers={"User-Agent": USER_AGENT},
+                                     timeout=aiohttp.ClientTimeout(total=15)) as session:
+        # 1) Fetch predictions (for all tracked coins concurrently)
+        for coin in TRACK:
+            logging.info("Fetching predictions for %s", coin["symbol"])
+        all_preds = await asyncio.gather(*(fetch_predictions_from_coincodex(session, coin["gecko_id"]) for coin in TRACK))
+        coin_ids = get_coin_ids(conn)
+        # single transaction (one commit / fsync) for the whole batch
+        with conn:
+            for coin, preds in zip(TRACK, all_preds):
+                symbol = coin["symbol"]
+                if not preds:
+                    logging.info("No predictions found for %s this run.", symbol)
+                    continue
+                for p in preds:
+                    # Store prediction with prediction_date == today
+                    pid = insert_prediction(conn, coin_ids[symbol], p.get("source", "CoinCodex"), today_iso, p["target_date"], p["predicted_price"])
+                    logging.info("Stored prediction %s -> %s (id=%s)", symbol, p["target_date"], pid)
 
-        logging.info("Fetching predictions for %s", symbol)
-        preds = fetch_predictions_from_coincodex(gecko_id)
-        if not preds:
-            logging.info("No predictions found for %s this run.", symbol)
+        # 2) Evaluate due predictions (target_date <= today) that aren't evaluated yet
+        due = find_due_predictions(conn, today_iso)
+        if not due:
+            logging.info("No due predictions to evaluate today.")
         else:
-            for p in preds:
-                # Store prediction with prediction_date == today
-                pid = insert_prediction(conn, symbol, p.get("source", "CoinCodex"), today_iso, p["target_date"], p["predicted_price"])
-                logging.info("Stored prediction %s -> %s (id=%s)", symbol, p["target_date"], pid)
-                # be gentle with target site
-                time.sleep(1)
-
-    # 2) Evaluate due predictions (target_date <= today) that aren't evaluated yet
-    due = find_due_predictions(conn, today_iso)
-    if not due:
-        logging.info("No due predictions to evaluate today.")
-    else:
-        logging.info("Found %d due predictions to evaluate", len(due))
-        for row in due:
-            prediction_id, symbol, source, target_date, predicted_price = row
-            # find gecko_id mapping
-            gecko_id = next((c["gecko_id"] for c in TRACK if c["symbol"] == symbol), None)
-            if not gecko_id:
-                logging.error("No CoinGecko id mapping for symbol %s; skipping", symbol)
-                continue
-            actual = get_actual_price_from_coingecko(gecko_id, target_date)
-            if actual is None:
-                logging.warning("Could not fetch actual price for %s on %s", symbol, target_date)
-                continue
-            abs_error = abs(predicted_price - actual)
-            pct_error = (abs_error / actual) * 100 if actual != 0 else None
-            insert_result(conn, prediction_id, actual, abs_error, pct_error)
-            logging.info("Evaluated prediction id=%s symbol=%s target=%s predicted=%.4f actual=%.4f pct_error=%s",
-                         prediction_id, symbol, target_date, predicted_price, actual, f"{pct_error:.2f}%" if pct_error is not None else "N/A")
-            # avoid hitting rate limits
-            time.sleep(1)
+            logging.info("Found %d due predictions to evaluate", len(due))
+            # group due rows by coin so each coin needs a single range request
+            by_coin = {}
+            for row in due:
+                prediction_id, symbol, source, target_date, predicted_price, gecko_id = row
+                if not gecko_id:
+                    logging.error("No CoinGecko id mapping for symbol %s; skipping", symbol)
+                    continue
+                by_coin.setdefault(gecko_id, []).append(row)
+            # several predictions often share a (coin, target_date); look each one up only once
+            dates = {g: sorted({r[3] for r in coin_rows}) for g, coin_rows in by_coin.items()}
+            # serve what we can from the local price cache, fetch the rest
+            prices = {g: get_cached_prices(conn, g, ds[0], ds[-1]) for g, ds in dates.items()}
+            uncached = {g: [d for d in ds if d not in prices[g]] for g, ds in dates.items()}
+            uncached = {g: ds for g, ds in uncached.items() if ds}
+            ranges = await asyncio.gather(*(
+                get_price_range_from_coingecko(session, g, ds[0], ds[-1]) for g, ds in uncached.items()))
+            fetched = {}
+            for (gecko_id, ds), coin_prices in zip(uncached.items(), ranges):
+                for d in ds:
+                    if d in coin_prices:
+                        fetched[(gecko_id, d)] = coin_prices[d]
+            # fall back to the per-day /history endpoint for dates the range response didn't cover
+            missing = [(g, d) for g, ds in uncached.items() for d in ds if (g, d) not in fetched]
+            fallback = await asyncio.gather(*(get_actual_price_from_coingecko(session, g, d) for g, d in missing))
+            fetched.update((key, actual) for key, actual in zip(missing, fallback) if actual is not None)
+            for (gecko_id, target_date), actual in fetched.items():
+                prices[gecko_id][target_date] = actual
+            # only cache days that are over; today's price may still be settling
+            with conn:
+                cache_prices(conn, [(g, d, usd) for (g, d), usd in fetched.items() if d < today_iso])
+            results = []
+            for gecko_id, coin_rows in by_coin.items():
+                for row in coin_rows:
+                    prediction_id, symbol, source, target_date, predicted_price, _ = row
+                    actual = prices[gecko_id].get(target_date)
+                    if actual is None:
+                        logging.warning("Could not fetch actual price for %s on %s", symbol, target_date)
+                        continue
+                    abs_error = abs(predicted_price - actual)
+                    pct_error = (abs_error / actual) * 100 if actual != 0 else None
+                    results.append((prediction_id, actual, abs_error, pct_error))
+                    logging.info("Evaluated prediction id=%s symbol=%s target=%s predicted=%.4f actual=%.4f pct_error=%s",
+                                 prediction_id, symbol, target_date, predicted_price, actual, f"{pct_error:.2f}%" if pct_error is not None else "N/A")
+            with conn:
+                insert_results(conn, results)
 
     conn.close()
     logging.info("Run complete.")
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())